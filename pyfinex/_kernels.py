@@ -0,0 +1,119 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional, kernels then run as plain Python
+    HAVE_NUMBA = False  # Callers should prefer pandas over slow kernels
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit returning the function unchanged."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def apply_splits(values, date_idx, col_idx, multiplier):
+    """
+    Apply stock split adjustments in place to a matrix of trade changes.
+
+    Holdings are accumulated per column only up to the latest split of that
+    column, so assets that never split are not touched.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D float64 array of unit changes (dates x assets), modified in place.
+    date_idx : np.ndarray
+        Row position of each split event, sorted in ascending order.
+    col_idx : np.ndarray
+        Column position of each split event.
+    multiplier : np.ndarray
+        Split ratio of each split event (e.g. 10.0 for a 10:1 split).
+    """
+    held = np.zeros(values.shape[1])
+    summed = np.zeros(values.shape[1], dtype=np.int64)  # Rows accumulated
+
+    for k in range(date_idx.shape[0]):
+        row, col = date_idx[k], col_idx[k]
+
+        # Bring the running holdings of the asset up to the split date
+        held[col] += values[summed[col]:row + 1, col].sum()
+        summed[col] = row + 1
+
+        # Compute adjustment and apply
+        adjust = held[col] * (multiplier[k] - 1.0)
+        values[row, col] += adjust
+        held[col] += adjust
+
+
+@njit(cache=True)
+def _fill_column(col):
+    """Linearly interpolate the NaNs of a 1D array in place, carrying the
+    first and last valid values out to the edges."""
+    last = -1  # Position of the last valid value seen
+
+    for i in range(col.shape[0]):
+        if np.isnan(col[i]):
+            continue
+        if last == -1:
+            col[:i] = col[i]  # Leading gap takes the first value
+        elif i - last > 1:
+            step = (col[i] - col[last]) / (i - last)
+            for k in range(last + 1, i):
+                col[k] = col[last] + step * (k - last)
+        last = i
+
+    if last != -1:
+        col[last + 1:] = col[last]  # Trailing gap keeps the last value
+
+
+@njit(parallel=True, cache=True)
+def fill_linear(values):
+    """
+    Fill the NaNs of a matrix in place, column by column, in a single pass.
+
+    Interior gaps are interpolated linearly by position and edge gaps take
+    the nearest valid value, like pandas' ``interpolate(method='linear',
+    limit_direction='both')``. All-NaN columns are left untouched.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D float array (dates x assets), modified in place.
+    """
+    for j in prange(values.shape[1]):
+        _fill_column(values[:, j])
+
+
+@njit(parallel=True, cache=True)
+def resample_last(values, bin_idx, n_bins):
+    """
+    Take the last valid value of each column within each period.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D float array (dates x assets), with dates in ascending order.
+    bin_idx : np.ndarray
+        Period position of each row of `values`, non-decreasing.
+    n_bins : int
+        Number of periods.
+
+    Returns
+    -------
+    np.ndarray
+        2D array (periods x assets) of the same dtype as `values`, NaN where
+        a period has no valid value.
+    """
+    out = np.empty((n_bins, values.shape[1]), dtype=values.dtype)
+    out[:] = np.nan
+
+    for j in prange(values.shape[1]):
+        for i in range(values.shape[0]):
+            if not np.isnan(values[i, j]):
+                out[bin_idx[i], j] = values[i, j]  # Later rows overwrite
+
+    return out
@@ -0,0 +1,18 @@
+import functools
+import os
+import pandas as pd
+
+
+@functools.cache
+def _ticker_mapper():
+    """Returns the eToro to LSEG ticker mapping, loaded once on first use."""
+    return pd.read_csv(
+        os.path.join(os.path.dirname(__file__), 'ticker_mapper.csv'),
+        index_col=0
+    )['LSEG']
+
+
+@functools.cache
+def _asset_dtype():
+    """Returns a categorical dtype covering every mapped LSEG ticker."""
+    return pd.CategoricalDtype(sorted(_ticker_mapper().dropna().unique()))
@@ -2,7 +2,9 @@ import pyfinex.utils as utils
 import pandas as pd
 import numpy as np
 import datetime as dt
-from scipy import stats
+
+
+_RANGE_CACHE_SIZE = 128  # Max number of cached return intervals
 
 
 class Asset:
@@ -16,7 +18,7 @@ class Asset:
     freq : utils.Frequency
         The frequency at which the asset's data is evaluated.
     hpr : pd.Series
-        The returns of the asset, at the specified frequency.
+        The returns of the asset, at the specified frequency (read-only).
     name : str
         The asset's name.
     sdate : datetime
@@ -36,27 +38,42 @@ class Asset:
         name : str, optional
             The asset's name (Default = 'Asset').
         """
-        self._hpr = hpr
-        self._hpr.name = name
+        self._set_hpr(hpr, name)
         self.freq = utils.Frequency(freq)
         self.name = name
-        self.sdate, self.edate = self.hpr.index[0], self.hpr.index[-1]
+
+    def _set_hpr(self, hpr: pd.Series, name: str):
+        """Stores the Holding Period Returns along with the views and lookups
+        derived from them."""
+        self._hpr = hpr
+        self._hpr.name = name
+        self._hpr_values = self._hpr.to_numpy().view()
+        self._hpr_values.flags.writeable = False  # Shared, so read-only
+        self._hpr_readonly = pd.Series(self._hpr_values, index=self._hpr.index,
+                                       name=name, copy=False)
+        self.sdate, self.edate = self._hpr.index[0], self._hpr.index[-1]
         self._index_set = set(self._hpr.index)
+        self._range_cache = {}
 
     @property
     def hpr(self):
-        """User-facing property."""
+        """User-facing property. A read-only view, see `hpr_copy` for a
+        mutable copy."""
+        return self._hpr_readonly
+
+    def hpr_copy(self):
+        """Returns a mutable copy of the Holding Period Returns."""
         return self._hpr.copy()
 
     def apy(self, sdate=None, edate=None):
         """Returns the annualised return of the Asset."""
-        ret = self._hpr_range(sdate, edate)
-        return stats.gmean(ret + 1) ** self.freq.num() - 1
+        mean_log = np.log1p(self._hpr_range_np(sdate, edate)).mean()
+        return np.exp(mean_log * self.freq.periods_per_year) - 1
 
     def apr(self, sdate=None, edate=None):
         """Returns the Annualised Percentage Rate of the Asset."""
-        ret = self._hpr_range(sdate, edate)
-        return stats.gmean(ret + 1) * self.freq.num()
+        mean_log = np.log1p(self._hpr_range_np(sdate, edate)).mean()
+        return np.exp(mean_log) * self.freq.periods_per_year
 
     def cumul(self, sdate=None, edate=None):
         """Returns a cumulative returns Series of the Asset."""
@@ -67,7 +84,7 @@ class Asset:
         # Need to pre-pend 1 to keep return data intact if full sample
         if not sdate:
             start = ret.index[0]  # Get first date
-            new_start = start - dt.timedelta(days=self.freq.days())
+            new_start = start - dt.timedelta(days=self.freq.period_days)
             ret.loc[pd.Timestamp(new_start)] = 1
             ret.sort_index(inplace=True)
         else:
@@ -77,29 +94,59 @@ class Asset:
 
     def tr(self, sdate=None, edate=None):
         """Returns the Total Return of the asset."""
-        ret = self._hpr_range(sdate, edate).copy()  # Mutability safeguard
-        cumret = ret + 1  # Get gross returns
+        # Sum log gross returns, stabler than a product on long series
+        log_ret = np.log1p(self._hpr_range_np(sdate, edate))
 
-        return np.prod(cumret) - 1
+        return float(np.exp(np.nansum(log_ret)) - 1.0)
 
     def ytd(self):
         """Returns the Year-To-Date returns"""
-        year = dt.date.today().year  # Get current year
-        mask = self._hpr.index.year == year  # Create mask of current year
-        first_date = self._hpr[mask].index.min()
+        # Locate the first date of the current year (index is sorted)
+        year_start = pd.Timestamp(dt.date(dt.date.today().year, 1, 1))
+        pos = self._hpr.index.searchsorted(year_start, side='left')
+        if pos == len(self._hpr.index):
+            raise ValueError(f'No returns recorded in {year_start.year}.')
 
-        return self.tr(first_date, self.edate)
+        return self.tr(self._hpr.index[pos], self.edate)
 
     def vol(self, sdate=None, edate=None):
         """Returns the annualised volatility of the Asset."""
-        ret = self._hpr_range(sdate, edate)
-        return ret.std(ddof=1) * np.sqrt(self.freq.num())
+        ret = self._hpr_range_np(sdate, edate)
+        return np.nanstd(ret, ddof=1) * np.sqrt(self.freq.periods_per_year)
 
     def _hpr_range(self, sdate=None, edate=None):
         """Returns the Holding Period Returns in the specified interval."""
         if not (sdate or edate):
             return self._hpr
 
+        start, end = self._range_positions(sdate, edate)
+        return self._hpr.iloc[start:end]
+
+    def _hpr_range_np(self, sdate=None, edate=None):
+        """Returns a NumPy view of the Holding Period Returns in the specified
+        interval."""
+        if not (sdate or edate):
+            return self._hpr_values
+
+        start, end = self._range_positions(sdate, edate)
+        return self._hpr_values[start:end]
+
+    def _range_positions(self, sdate=None, edate=None):
+        """Returns the positions delimiting the specified interval."""
+        # Reuse positions of recently requested intervals
+        key = (sdate, edate)
+        if key not in self._range_cache:
+            if len(self._range_cache) >= _RANGE_CACHE_SIZE:
+                del self._range_cache[next(iter(self._range_cache))]
+            sdate, edate = self._range_bounds(sdate, edate)
+            self._range_cache[key] = (
+                self._hpr.index.searchsorted(sdate, side='left'),
+                self._hpr.index.searchsorted(edate, side='right'))
+
+        return self._range_cache[key]
+
+    def _range_bounds(self, sdate=None, edate=None):
+        """Returns the index labels delimiting the specified interval."""
         # Determine the range to use
         if sdate and edate:
             date_range = sdate, edate
@@ -110,13 +157,13 @@ class Asset:
 
         # Check if both dates are in index
         if all(date in self._index_set for date in date_range):
-            return self._hpr.loc[date_range[0]:date_range[1]]
+            return date_range
         else:
-            return self._adv_hpr_range(date_range[0], date_range[1])
+            return self._adv_range_bounds(date_range[0], date_range[1])
 
-    def _adv_hpr_range(self, sdate, edate):
+    def _adv_range_bounds(self, sdate, edate):
         """
-        Returns the Holding Period Returns in the specified interval.
+        Returns the index labels delimiting the specified interval.
         Used when dates are no in index
         """
         if sdate not in self._index_set:
@@ -124,4 +171,4 @@ class Asset:
         elif edate not in self._index_set:
             edate = utils.closest_date(self._hpr.index, edate)
 
-        return self._hpr.loc[sdate:edate]
+        return pd.Timestamp(sdate), pd.Timestamp(edate)
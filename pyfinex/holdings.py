@@ -1,7 +1,23 @@
 import pandas as pd
 import numpy as np
 import datetime as dt
+import hashlib
 import os
+import re
+import pyfinex.utils as utils
+from pyfinex._kernels import apply_splits
+from pyfinex._mapper import _asset_dtype, _ticker_mapper
+
+
+# Split details look like 'NVDA/USD 10:1'
+_SPLIT_RE = re.compile(
+    r'^(?P<Asset>\S+)\s+(?P<Numerator>\d+):(?P<Denominator>\d+)')
+
+# Thousands separators and spaces in eToro numeric columns
+_NUM_CLEAN_RE = re.compile(r'[,\s]')
+
+# Timestamp format of eToro account statements
+_ETORO_DATE_FORMAT = '%d/%m/%Y %H:%M:%S'
 
 
 class MappingError(Exception):
@@ -30,11 +46,6 @@ class Holdings:
     edate : datetime
         The end date of the portfolio data.
     """
-    _TICKER_MAPPER = pd.read_csv(
-        os.path.join(os.path.dirname(__file__), 'ticker_mapper.csv'),
-        index_col=0
-    )['LSEG'].to_dict()
-
     def __init__(self,
                  holdings: pd.DataFrame,
                  cashflows: pd.Series,
@@ -74,9 +85,14 @@ class Holdings:
             account statement.
         """
 
-        # Convert dates to DateTime
-        acc_activity["Date"] = pd.to_datetime(acc_activity["Date"],
-                                              dayfirst=True)
+        # Convert dates to DateTime (eToro uses a fixed day-first format)
+        try:
+            acc_activity["Date"] = pd.to_datetime(acc_activity["Date"],
+                                                  format=_ETORO_DATE_FORMAT)
+        except ValueError:
+            acc_activity["Date"] = pd.to_datetime(acc_activity["Date"],
+                                                  format='mixed',
+                                                  dayfirst=True)
 
         # Set dates as index
         acc_activity.set_index("Date", inplace=True)
@@ -85,10 +101,12 @@ class Holdings:
         columns_to_convert = acc_activity.loc[:, 'Amount':'Balance'].columns
 
         # Remove commas and strip spaces, then convert to float
-        acc_activity[columns_to_convert] = acc_activity[columns_to_convert]\
-            .replace(
-                {',': '', ' ': ''}, regex=True
-            ).apply(pd.to_numeric, errors='coerce')
+        for col in columns_to_convert:
+            values = acc_activity[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                values = values.astype(str)\
+                    .str.replace(_NUM_CLEAN_RE, '', regex=True)
+            acc_activity[col] = pd.to_numeric(values, errors='coerce')
 
         # Track cashflows
         cashflows = acc_activity.loc[
@@ -99,15 +117,17 @@ class Holdings:
         cashflows = cashflows.groupby(level=0).sum()
 
         # Make a cash balance series (will be appended back to holdings later)
-        cash_balance = acc_activity['Balance'].resample('D').last().ffill()
+        cash_balance = acc_activity['Balance']\
+            .groupby(acc_activity.index.normalize()).last().dropna()
 
         # Create a trades df subset of acc_activity
         transactions = ['Open Position', 'Position closed']
         trades = acc_activity.loc[
             acc_activity['Type'].isin(transactions)].copy()
 
-        # Get correct tickers
-        trades['Asset'] = Holdings._convert_etoro_tickers(trades['Details'])
+        # Get correct tickers (categorical for cheaper grouping)
+        trades['Asset'] = Holdings._convert_etoro_tickers(trades['Details'])\
+            .astype(_asset_dtype())
 
         # Make buys positive and sells negative
         trades['Change'] = np.where(trades['Type'] == 'Open Position',
@@ -115,16 +135,13 @@ class Holdings:
                                     - trades['Units / Contracts']
                                     )
 
-        # Drop unnecessary columns
-        trades = trades[['Asset', 'Change']]
-
-        # Aggregate trades of same positions at same time
-        trades = trades.groupby([trades.index, 'Asset'])['Change']\
-            .sum().reset_index()
-
-        # Pivot to have assets as columns
-        trades = trades.pivot(index='Date', columns='Asset', values='Change')
-        trades = trades.resample('D').sum()  # Resample to total EoD changes
+        # Pivot to have assets as columns, totalling EoD changes
+        # (days without trades are filled in later)
+        trades = trades.pivot_table(index=trades.index.normalize(),
+                                    columns='Asset', values='Change',
+                                    aggfunc='sum', fill_value=0,
+                                    observed=True)
+        trades.columns = trades.columns.astype(str)  # Plain ticker labels
 
         # Adjust for stock splits
         trades = Holdings._adjust_splits(trades=trades,
@@ -135,43 +152,108 @@ class Holdings:
         holdings[abs(holdings) < 1e-10] = 0  # Make small numbers 0
 
         # Bring holdings to current day
+        holdings, cash_balance = Holdings._to_current_day(holdings,
+                                                          cash_balance)
+
+        return cls(holdings=holdings,
+                   cashflows=cashflows,
+                   cash_holdings=cash_balance)
+
+    @classmethod
+    def from_etoro_file(cls, path: str, cache_dir: str = utils.CACHE_DIR):
+        """
+        Initialize a Holdings instance from an etoro account statement file,
+        caching the parsed result.
+
+        The parsed holdings are stored as Parquet files keyed on the
+        statement's path, modification time and size, so unchanged
+        statements are not parsed again. Requires a Parquet engine such as
+        pyarrow.
+
+        Parameters
+        ----------
+        path : str
+            Path to an etoro account statement (Excel) file.
+        cache_dir : str or None, optional
+            Directory of the Parquet cache (Default = '~/.cache/pyfinex').
+            Pass None to disable caching.
+        """
+        if cache_dir is None:
+            acc_activity = pd.read_excel(path, sheet_name='Account Activity')
+            return cls.from_etoro(acc_activity)
+
+        # Key the cache on the statement file's identity
+        stat = os.stat(path)
+        key = hashlib.md5(f'{os.path.abspath(path)}:{stat.st_mtime}:'
+                          f'{stat.st_size}'.encode()).hexdigest()
+        cache_dir = os.path.expanduser(cache_dir)
+        files = {name: os.path.join(cache_dir, f'{key}_{name}.parquet')
+                 for name in ['holdings', 'cashflows', 'cash']}
+
+        if all(os.path.exists(file) for file in files.values()):
+            holdings = pd.read_parquet(files['holdings'])
+            cashflows = pd.read_parquet(files['cashflows'])['Cashflows']
+            cash_balance = pd.read_parquet(files['cash'])['USD']
+
+            # Cached holdings stop at the day they were parsed
+            holdings, cash_balance = Holdings._to_current_day(holdings,
+                                                              cash_balance)
+
+            return cls(holdings=holdings,
+                       cashflows=cashflows,
+                       cash_holdings=cash_balance)
+
+        acc_activity = pd.read_excel(path, sheet_name='Account Activity')
+        obj = cls.from_etoro(acc_activity)
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            obj.holdings.to_parquet(files['holdings'])
+            obj.cashflows.to_frame().to_parquet(files['cashflows'])
+            obj.cash_holdings.to_frame().to_parquet(files['cash'])
+        except (ImportError, OSError) as err:
+            print(f'Could not cache statement: {err}')  # Best-effort
+
+        return obj
+
+    @staticmethod
+    def _to_current_day(holdings: pd.DataFrame, cash_balance: pd.Series):
+        """Extends daily holdings and cash balance up to the previous day,
+        carrying the last known values forward."""
         full_range = pd.date_range(start=holdings.index.min(),
                                    end=(pd.Timestamp.today() - dt.timedelta(1))
                                    .normalize(), freq='D')
-        holdings = holdings.reindex(full_range).ffill()
-        cash_balance = cash_balance.reindex(full_range).ffill()
+        holdings = utils.ffill(holdings.reindex(full_range))
+        cash_balance = cash_balance.reindex(full_range, method='ffill')
         cash_balance.name = 'USD'
 
-        return cls(holdings=holdings,
-                   cashflows=cashflows,
-                   cash_holdings=cash_balance)
+        return holdings, cash_balance
 
     @staticmethod
     def _convert_etoro_tickers(series: pd.Series):
         '''Convert mapped eToro tickers to LSEG, or returns a list of tickers
-        to add to map'''
+        to add to map. Does not mutate `series`.'''
 
-        series = series.copy()  # Mutability safeguard
-
-        # Extract old tickers
-        old_ticks = [value.split('/')[0] for value in series.values]
-
-        # Create list of unmapped tickers
-        unmapped = [i for i in old_ticks if i not in Holdings._TICKER_MAPPER]
+        # Extract old tickers and map them
+        old_ticks = series.str.split('/', n=1).str[0]
+        mapped = old_ticks.map(_ticker_mapper())
 
         # If no unmapped tickers, return mapped
         # else raise error with unmapped tickers
-        if not unmapped:
-            return pd.Series([Holdings._TICKER_MAPPER[tick]
-                              for tick in old_ticks], index=series.index)
+        unmapped = mapped.isna()
+        if not unmapped.any():
+            return mapped
         else:
             # Raise unique mapping errors
-            raise MappingError(f'Unmapped tickers: {set(unmapped)}')
+            raise MappingError(f'Unmapped tickers: {set(old_ticks[unmapped])}')
 
     @staticmethod
     def _adjust_splits(trades: pd.DataFrame, acc_activity: pd.DataFrame):
         """Augments the trades DataFrame created from eToro.
 
+        Neither input is mutated; a new DataFrame is returned when splits
+        are found.
+
         Parameters
         ----------
         trades : pd.DataFrame
@@ -186,27 +268,18 @@ class Holdings:
             Updated trades DataFrame with split adjustments applied.
         """
 
-        # Mutability safeguard
-        trades = trades.copy()
-        acc_activity = acc_activity.copy()
-
         # Locate stock splits
         splits = acc_activity.loc[
             acc_activity['Type'] == 'corp action: Split']\
             .reset_index().drop_duplicates(subset=['Date', 'Details']).copy()
 
-        # Determine asset being split (looks like 'NVDA/USD 10:1' in 'Details')
-        splits['Asset'] = splits['Details'].apply(lambda x: x.split(' ')[0])
-        splits['Asset'] = Holdings._convert_etoro_tickers(splits['Asset'])
+        # Parse asset and ratio (looks like 'NVDA/USD 10:1' in 'Details')
+        parsed = splits['Details'].str.extract(_SPLIT_RE)
+        splits['Asset'] = Holdings._convert_etoro_tickers(parsed['Asset'])
 
         # Determine multiplier
-        splits['Numerator'] = splits['Details'].apply(
-            lambda x: int(x.split(' ')[1].split(':')[0]))
-
-        splits['Denominator'] = splits['Details'].apply(
-            lambda x: int(x.split(' ')[1].split(':')[1]))
-
-        splits['Multiplier'] = splits['Numerator'] / splits['Denominator']
+        splits['Multiplier'] = parsed['Numerator'].astype(int)\
+            / parsed['Denominator'].astype(int)
 
         # Drop unnecessary cols
         splits = splits[['Date', 'Asset', 'Multiplier']]
@@ -218,16 +291,24 @@ class Holdings:
         splits = splits.groupby(['Date', 'Asset'])['Multiplier']\
             .prod().reset_index()
 
-        # Add trades for splits
-        for _, split_r in splits.iterrows():
+        if splits.empty:
+            return trades
+
+        # Make sure every split date has a row to receive its adjustment
+        trades = trades.reindex(trades.index.union(splits['Date'].unique()),
+                                fill_value=0)
+
+        # Only assets that split need adjusting
+        assets = pd.Index(splits['Asset'].unique())
+        values = trades[assets].to_numpy(dtype=np.float64, copy=True)
 
-            # Get current holdings of the asset (t-1)
-            held = trades.loc[:split_r['Date'], split_r['Asset']]\
-                .cumsum().iloc[-1]
+        # Locate split events in the trades matrix
+        date_idx = trades.index.get_indexer(splits['Date'])
+        col_idx = assets.get_indexer(splits['Asset'])
 
-            # Compute adjustment and apply
-            new = held * split_r['Multiplier']  # New balance should be
-            adjust = new - held
-            trades.loc[split_r['Date'], split_r['Asset']] += adjust
+        # Apply adjustments in date order (splits are sorted by date)
+        apply_splits(values, date_idx, col_idx,
+                     splits['Multiplier'].to_numpy(dtype=np.float64))
+        trades[assets] = values
 
         return trades
@@ -1,3 +1,5 @@
+from functools import cached_property
+import numpy as np
 import pandas as pd
 from pyfinex.holdings import Holdings
 import pyfinex.utils as utils
@@ -71,10 +73,9 @@ class Portfolio(Asset):
         assert all(holdings_obj.holdings.columns == prices.columns)
 
         # Holdings and prices should be indexed identically
-        common_dates = holdings_obj.holdings.index\
-            .intersection(prices.index)
-        self.holdings = holdings_obj.holdings.loc[common_dates]
-        self.prices = prices.loc[common_dates]
+        self.holdings, self.prices = holdings_obj.holdings\
+            .align(prices, join='inner', axis=0)
+        common_dates = self.holdings.index
 
         # Directly inherited traits from Holdings instance
         self.cashflows = holdings_obj.cashflows
@@ -82,60 +83,97 @@ class Portfolio(Asset):
         self.invested = holdings_obj.invested
         self.tickers = holdings_obj.tickers
 
-        # Calculate NAV
+        # Calculate asset values once, with cash as a final column
+        values = self.holdings.to_numpy(dtype=np.float64) \
+            * self.prices.to_numpy(dtype=np.float64)
+        self._breakdown_columns = self.holdings.columns
         if self.cash_holdings.any():
-            temp = self.holdings * self.prices
-            self.nav_breakdown = temp.merge(self.cash_holdings, how='inner',
-                                            left_index=True, right_index=True)
-        else:
-            self.nav_breakdown = self.holdings * self.prices
+            cash = self.cash_holdings.reindex(common_dates).fillna(0)\
+                .to_numpy(dtype=np.float64)
+            values = np.column_stack([values, cash])
+            self._breakdown_columns = self._breakdown_columns\
+                .append(pd.Index([self.cash_holdings.name]))
+        self._values = values
 
-        self.nav = self.nav_breakdown.sum(axis=1)
+        # NAV is the row-wise sum, shared with nav_breakdown and weights
+        self.nav = pd.Series(values.sum(axis=1), index=common_dates)
 
         # Add a value attr for quick check
         self.value = self.nav.iloc[-1]
 
         # Asset (parent class) attributes
         self.freq = utils.Frequency(freq)
-        self._hpr = self._calc_hpr()
-        self._hpr.name = name
-        self.sdate, self.edate = self.hpr.index[0], self.hpr.index[-1]
+        self._set_hpr(self._calc_hpr(), name)
         self.name = name
-        self._index_set = set(self._hpr.index)
 
-        # Add a weights attribute
-        self.weights = self.nav_breakdown.div(
-            self.nav_breakdown.sum(axis=1), axis=0)
+    @staticmethod
+    def batch_nav(holdings_stack: np.ndarray, prices: pd.DataFrame):
+        """
+        Computes the NAV of several holdings scenarios sharing one set of
+        prices.
+
+        Parameters
+        ----------
+        holdings_stack : np.ndarray
+            A 3D array of holdings (in units), shaped (dates, assets,
+            scenarios) and aligned with `prices`.
+        prices : pd.DataFrame
+            A DataFrame containing the historical prices for the assets,
+            indexed by dates (rows) and tickers (columns).
+
+        Returns
+        -------
+        pd.DataFrame
+            The NAV of each scenario (columns) over time (rows), excluding
+            cash.
+        """
+        nav = np.einsum('tas,ta->ts', holdings_stack,
+                        prices.to_numpy(dtype=np.float64))
+        return pd.DataFrame(nav, index=prices.index)
+
+    @cached_property
+    def nav_breakdown(self):
+        """The portfolio's assets' value over time, computed on first use."""
+        return pd.DataFrame(self._values, index=self.nav.index,
+                            columns=self._breakdown_columns)
+
+    @cached_property
+    def weights(self):
+        """The weights of the portfolio's holdings, computed on first use."""
+        return pd.DataFrame(self._values / self.nav.to_numpy()[:, None],
+                            index=self.nav.index,
+                            columns=self._breakdown_columns)
 
     def _calc_hpr(self):
         """Calculates the holding period returns of the portfolio."""
-        # Get break dates
-        df = pd.concat([self.nav, self.cashflows], axis=1, join='outer')\
-            .reset_index()  # Merge series and reset index to numerical
-        df.columns = ['date', 'nav', 'cf']  # Rename cols
-        df['adj_cf'] = 0.0  # Create new col with def vals = 0
-
-        # Iterate through indexes and values of valid cashflows
-        # IMPORTANT: df is numerically indexed
-        for i, val in df.loc[df['cf'].notna(), 'cf'].items():
-            j = i - 1  # We look at previous indexes
-            while j >= 0:
-                if not pd.isna(df.at[j, 'nav']):  # Check if valid NAV
-                    df.at[i-1, 'adj_cf'] += val  # If yes, incr adj_cf
-                    break
-                j -= 1  # If invalid, increment counter downwards
-
-        # Drop subset to get back to only valid NAV and set index
-        df.dropna(subset=['nav'], inplace=True)
-        df.set_index('date', drop=True, inplace=True)
-
-        # Calculate theta
-        df['theta'] = (df['nav'] + df['adj_cf']) / df['nav']
-
-        # Reverse cumprod of thetas
-        df['adj_factor'] = df['theta'].iloc[::-1].cumprod().iloc[::-1]
-
-        adj_nav = df['nav'] * df['adj_factor']  # NAV reinvestments-adj
-        hpr = adj_nav.pct_change()  # Get returns
-
-        return hpr.iloc[1:]
+        # Align NAV and cashflows on the union of their dates
+        dates = self.nav.index.union(self.cashflows.index)
+        nav = self.nav.reindex(dates).to_numpy(dtype=np.float64)
+        cf = self.cashflows.reindex(dates).to_numpy(dtype=np.float64)
+
+        # Position of the last valid NAV at or before each date
+        valid_nav = ~np.isnan(nav)
+        last_valid = np.maximum.accumulate(
+            np.where(valid_nav, np.arange(len(dates)), -1))
+
+        # Attribute each cashflow to the last valid NAV preceding it
+        cf_rows = np.flatnonzero(~np.isnan(cf))
+        cf_rows = cf_rows[cf_rows > 0]
+        targets = last_valid[cf_rows - 1]
+        valid = targets >= 0  # Ignore cashflows before the first NAV
+
+        adj_cf = np.zeros(len(dates))
+        np.add.at(adj_cf, targets[valid], cf[cf_rows[valid]])
+
+        # Keep only dates with a valid NAV
+        nav, adj_cf = nav[valid_nav], adj_cf[valid_nav]
+        dates = dates[valid_nav]
+
+        # Calculate theta and its reverse cumprod
+        theta = (nav + adj_cf) / nav
+        adj_factor = np.cumprod(theta[::-1])[::-1]
+
+        adj_nav = nav * adj_factor  # NAV reinvestments-adj
+        hpr = adj_nav[1:] / adj_nav[:-1] - 1  # Get returns
+
+        return pd.Series(hpr, index=dates[1:])
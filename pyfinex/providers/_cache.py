@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+
+
+def _cache_key(tickers: list, sdate: str, edate: str, adj: str, freq: str,
+               dtype='float64'):
+    """Returns a stable hash identifying a historical data request."""
+    request = [sorted(tickers), sdate, edate, adj, freq, dtype]
+    return hashlib.md5(json.dumps(request).encode()).hexdigest()
+
+
+class FileCache:
+    """
+    A persistent on-disk cache of DataFrames.
+
+    Each entry is stored as a Parquet file with a JSON sidecar recording when
+    it was written and how long it stays fresh. Requires a Parquet engine
+    such as pyarrow.
+
+    Attributes
+    ----------
+    root : str
+        The directory holding the cache files.
+    """
+
+    def __init__(self, root: str):
+        """Initialise a FileCache object.
+
+        Parameters
+        ----------
+        root : str
+            The directory holding the cache files.
+        """
+        self.root = os.path.expanduser(root)
+
+    def get(self, key: str, stale=False):
+        """Returns the cached DataFrame for `key`, or None if it is missing
+        or expired (unless `stale` is True)."""
+        data, meta = self._paths(key)
+        if not (os.path.exists(data) and os.path.exists(meta)):
+            return None
+
+        with open(meta) as file:
+            info = json.load(file)
+
+        expired = info['ttl'] is not None \
+            and time.time() - info['ts'] > info['ttl']
+        if expired and not stale:
+            return None
+
+        return pd.read_parquet(data)
+
+    def set(self, key: str, frame: pd.DataFrame, ttl=None, **meta):
+        """Stores `frame` under `key` for `ttl` seconds (None = forever),
+        alongside any extra metadata."""
+        data, meta_path = self._paths(key)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            frame.to_parquet(data)
+        except (ImportError, OSError) as err:
+            print(f'Could not cache data: {err}')  # Caching is best-effort
+            return
+
+        with open(meta_path, 'w') as file:
+            json.dump({'ts': time.time(), 'ttl': ttl, **meta}, file)
+
+    def _paths(self, key: str):
+        """Returns the data and metadata file paths for `key`."""
+        return (os.path.join(self.root, f'{key}.parquet'),
+                os.path.join(self.root, f'{key}.json'))
+
+
+class ShardCache:
+    """
+    A persistent on-disk store of historical prices, sharded by ticker and
+    year.
+
+    The contiguous date range already fetched for each ticker is recorded in
+    a JSON coverage file, so overlapping requests only need to fetch the
+    dates not yet stored. Requires a Parquet engine such as pyarrow.
+
+    Attributes
+    ----------
+    root : str
+        The directory holding the shards.
+    """
+
+    def __init__(self, root: str):
+        """Initialise a ShardCache object.
+
+        Parameters
+        ----------
+        root : str
+            The directory holding the shards.
+        """
+        self.root = os.path.expanduser(root)
+
+    def missing(self, ticker: str, sdate: str, edate: str):
+        """Returns the (start, end) window to fetch so that the coverage of
+        `ticker` includes [sdate, edate], or None if it already does.
+
+        The window extends the current coverage without leaving gaps."""
+        sdate, edate = pd.Timestamp(sdate), pd.Timestamp(edate)
+        coverage = self._coverage(ticker)
+        if coverage is None:
+            return sdate, edate
+
+        covered_s, covered_e = coverage
+        day = pd.Timedelta(days=1)
+        start = sdate if sdate < covered_s else covered_e + day
+        end = edate if edate > covered_e else covered_s - day
+
+        return (start, end) if start <= end else None
+
+    def store(self, ticker: str, prices: pd.Series, sdate, edate):
+        """Stores the prices of `ticker` fetched over [sdate, edate].
+
+        Coverage stops at the previous day, as today's close may still
+        change. Nothing is recorded when no prices came back, so the ticker
+        is fetched again once its negative cache entry expires."""
+        prices = prices.dropna()
+        if prices.empty:
+            return
+
+        for year, part in prices.groupby(prices.index.year):
+            path = self._shard(ticker, year)
+            if os.path.exists(path):
+                part = part.combine_first(pd.read_parquet(path)[ticker])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part.to_frame(ticker).to_parquet(path)
+
+        # Extend the coverage (missing() guarantees it stays contiguous)
+        yesterday = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+        sdate, edate = pd.Timestamp(sdate), min(pd.Timestamp(edate), yesterday)
+        coverage = self._coverage(ticker)
+        if coverage is not None:
+            sdate, edate = min(sdate, coverage[0]), max(edate, coverage[1])
+        if sdate > edate:
+            return
+
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        with open(os.path.join(self._ticker_dir(ticker), 'coverage.json'),
+                  'w') as file:
+            json.dump([sdate.strftime('%Y-%m-%d'),
+                       edate.strftime('%Y-%m-%d')], file)
+
+    def load(self, tickers: list, sdate: str, edate: str):
+        """Returns the stored prices of `tickers` over [sdate, edate]."""
+        sdate, edate = pd.Timestamp(sdate), pd.Timestamp(edate)
+
+        columns = []
+        for ticker in tickers:
+            paths = [self._shard(ticker, year)
+                     for year in range(sdate.year, edate.year + 1)]
+            parts = [pd.read_parquet(path)[ticker]
+                     for path in paths if os.path.exists(path)]
+            columns.append(pd.concat(parts) if parts
+                           else pd.Series(dtype='float64', name=ticker,
+                                          index=pd.DatetimeIndex([])))
+
+        output = pd.concat(columns, axis=1, sort=True)
+        return output.loc[sdate:edate]
+
+    def _coverage(self, ticker: str):
+        """Returns the (start, end) dates stored for `ticker`, or None."""
+        path = os.path.join(self._ticker_dir(ticker), 'coverage.json')
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as file:
+            sdate, edate = json.load(file)
+
+        return pd.Timestamp(sdate), pd.Timestamp(edate)
+
+    def _ticker_dir(self, ticker: str):
+        """Returns the directory holding the shards of `ticker`."""
+        return os.path.join(self.root, ticker.replace(os.sep, '_'))
+
+    def _shard(self, ticker: str, year: int):
+        """Returns the path of the shard of `ticker` for `year`."""
+        return os.path.join(self._ticker_dir(ticker), f'{year}.parquet')
@@ -1,43 +1,69 @@
-from functools import wraps
+from functools import cache, wraps
+import inspect
 from pyfinex.holdings import Holdings
 import time
+import random
+import threading
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 import pyfinex.utils as utils
+from pyfinex._kernels import HAVE_NUMBA, fill_linear, resample_last
+from pyfinex.providers._cache import FileCache
 
 
-def _retry(n: int, wait: int):
+def _retry(n: int,
+           base: float = 1.0,
+           max_delay: float = 30.0,
+           recoverable=(ConnectionError, TimeoutError)):
     """
     Decorator generator to retry execution up to `n` times.
 
+    Waits between attempts use decorrelated jitter: each is drawn uniformly
+    between `base` and three times the previous wait, capped at `max_delay`,
+    so concurrent callers spread out instead of retrying in lockstep.
+
     Parameters
     ----------
     n : int
         Maximum number of attempts.
-    wait : int, optional
-        Seconds to wait between attempts.
+    base : float, optional
+        Minimum seconds to wait after a failed attempt (default=1.0).
+    max_delay : float, optional
+        Upper bound on any single wait (default=30.0).
+    recoverable : tuple of type, optional
+        Transient exception types worth retrying. Any other exception is
+        raised immediately (default = (ConnectionError, TimeoutError)).
 
     Returns
     -------
     function
         A decorator that retries the wrapped function call.
     """
+    # A single attempt needs no retry plumbing
+    if n <= 1:
+        return lambda func: func
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            delay = base
             # Attempt a max of n times
             for attempt in range(1, n + 1):
                 # Try to execute function
                 try:
                     return func(*args, **kwargs)
-                # Handle execution errors
-                except Exception:
+                # Handle transient execution errors
+                except recoverable:
                     if attempt < n:
+                        delay = min(max_delay,
+                                    random.uniform(base, delay * 3))
                         print(
                             f'Attempt {attempt}/{n} failed. '
-                            f'Retrying in {wait} seconds...'
+                            f'Retrying in {delay:.1f} seconds...'
                         )
-                        time.sleep(wait)  # Wait before starting next attempt
+                        if delay:
+                            time.sleep(delay)  # Wait before next attempt
                     else:
                         print(f'Attempt {attempt}/{n} failed. '
                               f'Max attempts reached.')
@@ -46,42 +72,195 @@ def _retry(n: int, wait: int):
     return decorator
 
 
-def _treat_historical(historical: pd.DataFrame, freq: utils.Frequency):
+def _resample_last(historical: pd.DataFrame, freq: utils.Frequency,
+                   dtype=np.float64):
+    """Resamples daily prices to `freq`, keeping the last valid value of each
+    period like ``resample(...).last()``.
+
+    Sorted float frames of whole dates run through a single-pass kernel
+    when numba is available; anything else goes through pandas."""
+    index = historical.index
+    fast = HAVE_NUMBA and len(index) and index.is_monotonic_increasing \
+        and isinstance(index, pd.DatetimeIndex) and index.tz is None \
+        and (index == index.normalize()).all() \
+        and all(pd.api.types.is_float_dtype(col_dtype)
+                for col_dtype in historical.dtypes)
+    if not fast:
+        return historical.resample(freq.pandas_alias).last()
+
+    # Periods are labelled by their closing date, as in pandas
+    offset = pd.tseries.frequencies.to_offset(freq.pandas_alias)
+    periods = pd.date_range(offset.rollforward(index[0]),
+                            offset.rollforward(index[-1]),
+                            freq=freq.pandas_alias, name=index.name)
+    bin_idx = periods.searchsorted(index, side='left')
+
+    values = resample_last(historical.to_numpy(dtype=dtype), bin_idx,
+                           len(periods))
+    return pd.DataFrame(values, index=periods, columns=historical.columns)
+
+
+def _treat_historical(historical: pd.DataFrame, freq: utils.Frequency, *,
+                      copy=True, dtype=np.float64):
     """Handle missing data and resampling to match different market timings.
 
     Resamples to the specified frequency, warns about missing values,
-    and fills in missing data via linear interpolation.
+    and fills in missing data via linear interpolation. Pass `copy=False`
+    when `historical` may be modified in place. Float prices are returned
+    as `dtype` (np.float32 halves the memory of wide frames).
     """
-    historical = historical.copy()  # Prevent mutability issues
+    if freq.lseg != 'D':
+        historical = _resample_last(historical, freq, dtype=dtype)
+        copy = False  # Resampling already builds a new frame
 
-    if freq.f_lseg() != 'D':
-        historical = historical.resample(freq.f_lseg()).last()
+    # Float prices are handled as one NumPy matrix, rebuilt into a frame once
+    numeric = all(pd.api.types.is_float_dtype(col_dtype)
+                  for col_dtype in historical.dtypes)
+    if numeric:
+        # The NaN scan is memory-bound, so test the float buffer in one
+        # contiguous pass rather than through per-block isna dispatch
+        values = historical.to_numpy(dtype=dtype, copy=False)
+        # Casting to another dtype already yields a private array
+        copy = copy and bool((historical.dtypes == dtype).all())
+        col_missing = np.isnan(values).sum(axis=0)  # Per column
+    else:
+        col_missing = historical.isna().to_numpy().sum(axis=0)
 
     nrows, ncols = historical.shape
-    missing = historical.isna().mean()  # Gives % missing per column
+    tot_missing = int(col_missing.sum())
 
-    # Warn user of potentially problematic assets
-    for col, ratio in missing.items():
-        if ratio > DataProvider.THRESHOLD:
-            print(f'Missing {ratio:.2%} of values for {col}')
+    # Warn user of potentially problematic assets, in a single write
+    messages = []
+    if col_missing.max(initial=0) > DataProvider.THRESHOLD * nrows:
+        ratios = col_missing / nrows
+        bad = np.flatnonzero(ratios > DataProvider.THRESHOLD)
+        messages += [f'Missing {ratios[i]:.2%} of values for '
+                     f'{historical.columns[i]}' for i in bad]
+    if tot_missing:
+        messages.append(f'Interpolating {tot_missing:.0f} values '
+                        f'({tot_missing / (nrows * ncols):.2%})')
+    if messages:
+        print('\n'.join(messages))
+
+    # Fill in blanks, edges included in one pass
+    if numeric:
+        if copy or (tot_missing and not values.flags.writeable):
+            values = values.copy()  # Prevent mutability issues
+        if tot_missing and HAVE_NUMBA:
+            fill_linear(values)
+            tot_missing = 0  # Nothing left for pandas to fill
+        historical = pd.DataFrame(values, index=historical.index,
+                                  columns=historical.columns, copy=False)
+    elif copy:
+        historical = historical.copy()  # Prevent mutability issues
 
-    # Fill in blanks
-    tot_missing = historical.isna().sum().sum()
     if tot_missing:
-        print(f'Interpolating {tot_missing:.0f} values '
-              f'({tot_missing / (nrows * ncols):.2%})')
-        historical = historical.interpolate('linear').bfill().ffill()
+        # Interior gaps first, then carry the edges, all in place
+        historical.interpolate(method='linear', axis=0,
+                               limit_area='inside', inplace=True)
+        historical.bfill(inplace=True)
+        historical.ffill(inplace=True)
 
     return historical
 
 
+@cache
+def _provider_docs():
+    """Returns the docstrings of DataProvider methods, keyed by name."""
+    return {name: func.__doc__ for name, func
+            in inspect.getmembers(DataProvider, inspect.isfunction)
+            if func.__doc__}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker to fail fast while a data provider is unavailable.
+
+    The breaker opens after `failure_threshold` consecutive failures and
+    rejects calls until `reset_timeout` seconds have passed. It then lets a
+    single probe call through (half-open), closing again on success and
+    re-opening on failure. Other calls are rejected while the probe runs.
+
+    Attributes
+    ----------
+    failure_threshold : int
+        Consecutive failures after which the breaker opens.
+    reset_timeout : float
+        Seconds to wait before probing an open breaker.
+    state : {'closed', 'open', 'half-open'}
+        The current state of the breaker.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        """Initialise a closed CircuitBreaker.
+
+        Parameters
+        ----------
+        failure_threshold : int, optional
+            Consecutive failures after which the breaker opens (default=5).
+        reset_timeout : float, optional
+            Seconds to wait before probing an open breaker (default=60).
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False  # Whether a half-open probe is in flight
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Returns whether a call may go through."""
+        with self._lock:
+            if self.state == CircuitBreaker.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = CircuitBreaker.HALF_OPEN
+            if self.state == CircuitBreaker.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True  # Let a single probe through
+            return True
+
+    def record_success(self):
+        """Closes the breaker after a successful call."""
+        with self._lock:
+            self.state = CircuitBreaker.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Counts a failed call, opening the breaker if needed."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if (self.state == CircuitBreaker.HALF_OPEN
+                    or self._failures >= self.failure_threshold):
+                self.state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Ends a call that neither succeeded nor failed transiently, letting
+        another probe through if the breaker is half-open."""
+        with self._lock:
+            self._probing = False
+
+
 class DataProvider(ABC):
     """Abstract base class for data provider sub-classes."""
 
     THRESHOLD = 0.05
+    NEGATIVE_TTL = 86400  # Seconds to skip tickers that returned no data
     _ADJ_OPTIONS = ['adjusted', 'unadjusted']
 
-    def __init__(self, retry_limit=3, wait=3):
+    def __init__(self, retry_limit=3, wait=3, cache_dir=utils.CACHE_DIR):
         """Initialise a DataProvider object.
 
         Parameters
@@ -90,9 +269,27 @@ class DataProvider(ABC):
             Maximum number of attempts to fetch data (default=3).
         wait : int, optional
             Seconds to wait between attempts (default=3).
+        cache_dir : str or None, optional
+            Directory of the on-disk cache of fetched data
+            (default='~/.cache/pyfinex'). Pass None to disable caching.
         """
         self.retry_limit = retry_limit
         self.wait = wait
+        self._breaker = CircuitBreaker()
+        self._negative = {}  # Expiry times of tickers without data
+        self._cache = FileCache(cache_dir) if cache_dir else None
+        self._inflight = {}  # Futures of requests being fetched, by key
+        self._inflight_lock = threading.Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        """Copies the docstrings of DataProvider methods onto undocumented
+        overrides in the new subclass."""
+        super().__init_subclass__(**kwargs)
+        # Only methods overridden in the subclass itself need a docstring
+        for attr_name, doc in _provider_docs().items():
+            child_method = cls.__dict__.get(attr_name)
+            if inspect.isfunction(child_method) and not child_method.__doc__:
+                child_method.__doc__ = doc
 
     @abstractmethod
     def get_historical(self,
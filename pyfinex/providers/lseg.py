@@ -1,60 +1,327 @@
-from pyfinex.providers.base import DataProvider, _retry, _treat_historical
-import refinitiv.data as rd
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from functools import cached_property, lru_cache, partial
+from pyfinex.providers.base import (CircuitOpenError, DataProvider, _retry,
+                                    _treat_historical)
+from pyfinex.providers._cache import ShardCache, _cache_key
+import numpy as np
+import pandas as pd
+import os
+import re
+import time
 import pyfinex.utils as utils
 
 
+@lru_cache(maxsize=None)
+def _to_freq(freq: str):
+    """Returns the Frequency of a one letter acronym, cached."""
+    return utils.Frequency(freq)
+
+
 class LSEG(DataProvider):
 
+    CHUNK_SIZE = 50  # Tickers per request
+    MAX_WORKERS = 4  # Concurrent requests
+    HEDGE_MIN_DELAY = 5.0  # Seconds before a slow chunk is requested again
+    FIELDS = {  # Close price field for each adjustment type
+        'adjusted': 'TR.CLOSEPRICE',
+        'unadjusted': 'TR.CLOSEPRICE(Adjusted=0)',
+    }
+
     def get_historical(self,
                        tickers: list,
                        sdate: str,
                        edate: str,
                        adj='adjusted',
-                       freq='D'):
-
-        freq = utils.Frequency(freq)  # Convert to freq object
-
-        @_retry(n=self.retry_limit, wait=self.wait)  # Add retry logic
-        def attempt():
-
-            print('Attempting LSEG retrieval...')  # Give feedback to user
-
-            if adj == 'adjusted':
-                output = rd.get_history(universe=tickers,
-                                        fields=['TR.CLOSEPRICE'],
-                                        parameters={
-                                            'SDate': sdate,
-                                            'EDate': edate,
-                                            'Curn': 'USD',
-                                            'Frq': freq.f_lseg(),
-                                            },
-                                        )
-
-            elif adj == 'unadjusted':
-                output = rd.get_history(universe=tickers,
-                                        fields=['TR.CLOSEPRICE(Adjusted=0)'],
-                                        parameters={
-                                            'SDate': sdate,
-                                            'EDate': edate,
-                                            'Curn': 'USD',
-                                            'Frq': freq.f_lseg(),
-                                            },
-                                        )
-
-            elif adj not in DataProvider._ADJ_OPTIONS:
-                raise ValueError('Invalid adjustment option.\n'
-                                 'Possible:{DataProvider._ADJ_OPTIONS}')
-
-            else:
-                raise NotImplementedError(
-                    'The adjustment type is not supported by LSEG')
-
-            print('Retrieval successful!')  # Give feedback
-
-            # When fetching for one stock, the col name != the ticker
-            if len(tickers) == 1:
-                output.columns = tickers  # Fix this to ensure compatibility
-
-            # Treat NaN values
-            return (_treat_historical(output, freq=freq))
-        return attempt()
+                       freq='D',
+                       field=None,
+                       dtype=np.float64):
+        """Retrieve historical prices from LSEG.
+
+        Parameters
+        ----------
+        tickers : list of str
+            List of tickers for which to retrieve prices.
+        sdate : str
+            Start date of fetch (format: 'YYYY-MM-DD').
+        edate : str
+            End date of fetch (format: 'YYYY-MM-DD').
+        adj : {'adjusted', 'unadjusted'}, optional
+            Adjustment type for the data (default = 'adjusted').
+            Options:
+            - 'adjusted': Returns adjusted data (e.g., for dividends and
+            splits).
+            - 'unadjusted': Returns unadjusted data.
+        freq: {'D', 'W', 'M', 'Y'} or utils.Frequency, optional
+            Frequency interval for fetch.
+        field : str, optional
+            A single LSEG field to retrieve instead of the close price
+            implied by `adj` (e.g. 'TR.PriceClose'). The close price remains
+            the default and fastest path.
+        dtype : type, optional
+            Float type of the returned prices (default = np.float64). Pass
+            np.float32 to halve the memory of wide frames.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe of prices, indexed by dates (rows) and tickers
+            (columns).
+        """
+
+        if adj not in DataProvider._ADJ_OPTIONS:
+            raise ValueError('Invalid adjustment option.\n'
+                             f'Possible:{DataProvider._ADJ_OPTIONS}')
+        elif adj not in LSEG.FIELDS:
+            raise NotImplementedError(
+                'The adjustment type is not supported by LSEG')
+
+        # Convert to freq object
+        freq = freq if isinstance(freq, utils.Frequency) else _to_freq(freq)
+
+        # Serve repeated requests from the disk cache
+        key = _cache_key(tickers, sdate, edate, field or adj, freq.value,
+                         np.dtype(dtype).name)
+        if self._cache is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached[tickers]
+
+        # Share the fetch of an identical request already in progress
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()[tickers]
+
+        try:
+            output = self._fetch_historical(key, tickers, sdate, edate, adj,
+                                            freq, field, dtype)
+        except BaseException as err:
+            future.set_exception(err)  # Waiting callers fail too
+            raise
+        else:
+            future.set_result(output)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+        return output
+
+    def _fetch_historical(self, key, tickers, sdate, edate, adj, freq,
+                          field, dtype):
+        """Fetches the prices of a get_historical request missing from the
+        disk cache, storing them there."""
+        # Skip tickers recently found to have no data
+        dataset = re.sub(r'\W+', '_', f'{field or adj}_{freq.value}')
+        now = time.monotonic()
+        fetchable = [ticker for ticker in tickers
+                     if self._negative.get((ticker, dataset, sdate, edate),
+                                           0) <= now]
+
+        # Work out which date window each ticker still needs. Adjusted
+        # history is restated after every split or dividend, so only
+        # unadjusted closes can be stitched from shards of different ages
+        unadjusted = (field or LSEG.FIELDS[adj]) == LSEG.FIELDS['unadjusted']
+        if self._cache is not None and unadjusted:
+            store = ShardCache(os.path.join(self._cache.root, 'shards',
+                                            dataset))
+            windows = {}
+            for ticker in fetchable:
+                window = store.missing(ticker, sdate, edate)
+                if window is not None:
+                    window = tuple(d.strftime('%Y-%m-%d') for d in window)
+                    windows.setdefault(window, []).append(ticker)
+        else:
+            store = None
+            windows = {(sdate, edate): fetchable}
+
+        # One job per chunk of tickers sharing the same missing window
+        jobs = [(group[i:i + self.CHUNK_SIZE], start, end)
+                for (start, end), group in windows.items()
+                for i in range(0, len(group), self.CHUNK_SIZE)]
+
+        results = []
+        if jobs:
+            recoverable = self._recoverable  # Imports the SDK
+            attempt = partial(self._attempt, adj=adj, freq=freq, field=field)
+
+            # Fail fast while LSEG is known to be down, using stale data
+            if not self._breaker.allow():
+                cached = self._cache.get(key, stale=True) \
+                    if self._cache is not None else None
+                if cached is not None:
+                    print('LSEG unavailable, returning stale cached data.')
+                    return cached[tickers]
+                raise CircuitOpenError('LSEG retrieval is temporarily '
+                                       'disabled after repeated failures.')
+
+            # Fetch chunks concurrently, each retried on its own
+            try:
+                results = self._run_hedged(attempt, jobs)
+            except recoverable:
+                self._breaker.record_failure()
+                raise
+            except BaseException:
+                self._breaker.release()  # Not a provider outage
+                raise
+            self._breaker.record_success()
+
+        # Remember tickers without any data over the requested range
+        for (chunk, start, end), result in zip(jobs, results):
+            if (start, end) != (sdate, edate):
+                continue
+            for ticker in chunk:
+                if ticker not in result or result[ticker].isna().all():
+                    self._negative[(ticker, dataset, sdate, edate)] = \
+                        now + DataProvider.NEGATIVE_TTL
+
+        output = None
+        if store is not None:
+            # Persist new rows, then read the full range back from disk
+            try:
+                for (chunk, start, end), result in zip(jobs, results):
+                    for ticker in chunk:
+                        if ticker in result:
+                            store.store(ticker, result[ticker], start, end)
+                output = store.load(tickers, sdate, edate)
+            except (ImportError, OSError) as err:
+                print(f'Could not cache data: {err}')  # Best-effort
+
+        if output is None:
+            output = pd.concat(results, axis=1, sort=True) if results \
+                else pd.DataFrame(index=pd.DatetimeIndex([], name='Date'),
+                                  columns=tickers, dtype='float64')
+        output = output.reindex(columns=tickers)  # Requested order
+        incomplete = output.empty or bool(output.isna().all().any())
+
+        # Treat NaN values
+        output = _treat_historical(output, freq=freq, copy=False,
+                                   dtype=dtype)
+
+        # Past unadjusted closes never change; adjusted prices, ranges
+        # reaching today, or missing a ticker that may still come back,
+        # expire after a day
+        if self._cache is not None:
+            today = pd.Timestamp.today().normalize()
+            ttl = DataProvider.NEGATIVE_TTL \
+                if not unadjusted or incomplete \
+                or pd.Timestamp(edate) >= today else None
+            self._cache.set(key, output, ttl=ttl, tickers=list(tickers),
+                            sdate=sdate, edate=edate)
+
+        return output
+
+    def _run_hedged(self, attempt, jobs):
+        """Runs `attempt` for each (chunk, start, end) job concurrently and
+        returns the results in job order.
+
+        A chunk still running past the 95th percentile of completed
+        durations (at least HEDGE_MIN_DELAY seconds) is requested once more,
+        and whichever copy finishes first is kept."""
+        executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        owners, starts = {}, {}  # Job position and start time per future
+
+        def submit(i):
+            start = []  # Filled in once the request actually runs
+            future = executor.submit(LSEG._timed, attempt, jobs[i], start)
+            owners[future], starts[future] = i, start
+
+        results, durations, hedged = {}, [], set()
+        try:
+            for i in range(len(jobs)):
+                submit(i)
+
+            while len(results) < len(jobs):
+                # Wake up when the next running chunk becomes due a hedge
+                delay = max(np.percentile(durations, 95),
+                            self.HEDGE_MIN_DELAY) if durations else None
+                now = time.monotonic()
+                due = [starts[future][0] + delay - now
+                       for future, i in owners.items()
+                       if delay and starts[future] and i not in hedged]
+                done, _ = wait(owners, timeout=max(min(due), 0) if due
+                               else None, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    i = owners.pop(future)
+                    del starts[future]
+                    if i in results or future.cancelled():
+                        continue  # The other copy already finished
+                    try:
+                        results[i], elapsed = future.result()
+                    except BaseException:
+                        if i in owners.values():
+                            continue  # The other copy may still succeed
+                        raise
+                    durations.append(elapsed)
+                    for other, j in owners.items():
+                        if j == i:
+                            other.cancel()
+
+                # Request chunks running past the hedge delay once more
+                if not durations:
+                    continue
+                delay = max(np.percentile(durations, 95),
+                            self.HEDGE_MIN_DELAY)
+                now = time.monotonic()
+                for future, i in list(owners.items()):
+                    if i not in hedged and i not in results \
+                            and starts[future] \
+                            and now - starts[future][0] >= delay:
+                        print('Hedging slow LSEG retrieval...')
+                        hedged.add(i)
+                        submit(i)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return [results[i] for i in range(len(jobs))]
+
+    @staticmethod
+    def _timed(attempt, job, start):
+        """Runs `attempt` on a job, returning its result and duration."""
+        start.append(time.monotonic())
+        return attempt(*job), time.monotonic() - start[0]
+
+    @cached_property
+    def _recoverable(self):
+        """Transient exception types worth retrying."""
+        import refinitiv.data as rd  # Deferred, the SDK is slow to import
+        return (ConnectionError, TimeoutError, rd.errors.RDError)
+
+    @cached_property
+    def _attempt(self):
+        """A single retrieval, wrapped in retry logic on first use."""
+        return _retry(n=self.retry_limit, base=self.wait,
+                      recoverable=self._recoverable)(self._raw_attempt)
+
+    def _raw_attempt(self, chunk, start, end, adj, freq, field):
+        """Retrieves the prices of a chunk of tickers over [start, end]."""
+        import refinitiv.data as rd
+
+        print('Attempting LSEG retrieval...')  # Give feedback to user
+
+        fields = [field or LSEG.FIELDS[adj]]
+        output = rd.get_history(universe=chunk,
+                                fields=fields,
+                                parameters={
+                                    'SDate': start,
+                                    'EDate': end,
+                                    'Curn': 'USD',
+                                    'Frq': freq.lseg,
+                                    },
+                                )
+
+        print('Retrieval successful!')  # Give feedback
+
+        # Label columns by requested ticker, in request order (a lone ticker
+        # comes back named after its field, so relabel it by position)
+        if len(chunk) == 1 and len(output.columns) == 1:
+            output.columns = chunk
+        elif not output.columns.equals(pd.Index(chunk)):
+            output = output[[ticker for ticker in chunk
+                             if ticker in output.columns]]
+
+        return output
@@ -1,7 +1,11 @@
 from enum import Enum
+import os
 import pandas as pd
 import numpy as np
 
+# Default location of on-disk caches (statements, provider data)
+CACHE_DIR = os.path.join('~', '.cache', 'pyfinex')
+
 
 class Frequency(Enum):
     """
@@ -13,6 +17,14 @@ class Frequency(Enum):
         The one letter acronym.
     name : {'DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY'}
         The frequency, in readable format.
+    lseg : str
+        The LSEG 'Frq' parameter value.
+    pandas_alias : str
+        The pandas offset alias.
+    periods_per_year : float
+        The number of periods in a year.
+    period_days : float
+        The approximate number of calendar days in a period.
     """
     DAILY = "D"
     WEEKLY = "W"
@@ -20,46 +32,59 @@ class Frequency(Enum):
     YEARLY = "Y"
 
     def num(self):
-        mapping = {
-            'D': 252.0,
-            'W': 52.0,
-            'M': 12.0,
-            'Y': 1.0,
-        }
-        return mapping[self.value]
+        return self.periods_per_year
 
     def days(self):
-        mapping = {
-            'D': 1.0,
-            'W': 7.0,
-            'M': 30.0,
-            'Y': 360.0,
-        }
-        return mapping[self.value]
+        return self.period_days
 
     def f_pandas(self):
-        mapping = {
-            'D': 'D',
-            'W': 'W',
-            'M': 'ME',
-            'Y': 'YE',
-        }
-        return mapping[self.value]
+        return self.pandas_alias
 
     def f_lseg(self):
-        mapping = {
-            "D": "D",
-            "W": "W",
-            "M": "M",
-            "Y": "Y",
-        }
-        return mapping[self.value]
+        return self.lseg
+
+
+# LSEG 'Frq' value, pandas offset alias, periods per year and approximate
+# calendar days per period of each frequency
+_FREQ_META = {
+    'D': ('D', 'D', 252.0, 1.0),
+    'W': ('W', 'W', 52.0, 7.0),
+    'M': ('M', 'ME', 12.0, 30.0),
+    'Y': ('Y', 'YE', 1.0, 360.0),
+}
+
+# Store them on the members, so lookups are plain attribute reads
+for _freq in Frequency:
+    _freq.lseg, _freq.pandas_alias, _freq.periods_per_year, \
+        _freq.period_days = _FREQ_META[_freq.value]
+del _freq
 
 
 def closest_date(index: pd.DatetimeIndex, target):
-    """Vectorized operation to find closest index."""
+    """Binary search for the closest date of a sorted index. Ties resolve
+    to the earlier date."""
     target = pd.Timestamp(target)
-    closest_id = np.abs(index - target).argmin()
-    closest_dt = index[closest_id]
+    pos = index.searchsorted(target)
+
+    # Target falls outside the index
+    if pos == 0:
+        return index[0]
+    if pos == len(index):
+        return index[-1]
+
+    # Otherwise compare the two neighbours
+    before, after = index[pos - 1], index[pos]
+    return after if after - target < target - before else before
+
+
+def ffill(frame: pd.DataFrame):
+    """Vectorized forward-fill of missing values down each column."""
+    values = frame.to_numpy(dtype=np.float64)
+    rows = np.arange(values.shape[0])[:, None]
+
+    # Position of the last valid row seen so far, per column
+    idx = np.where(np.isnan(values), 0, rows)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = values[idx, np.arange(values.shape[1])]
 
-    return closest_dt
+    return pd.DataFrame(filled, index=frame.index, columns=frame.columns)